@@ -8,30 +8,60 @@ No third-party dependency required.
 from __future__ import annotations
 
 import argparse
+import functools
+import heapq
 import json
+import math
 import re
+import sys
 import zipfile
 from datetime import date
 from pathlib import Path
-from typing import Any
-from xml.sax.saxutils import escape
+from typing import IO, Any, Callable, Iterable, Iterator
 
-SHEET_ORDER = ["summary", "benchmark", "feature_matrix", "pricing_gtm", "sources"]
+SHEET_ORDER: list[str] = ["summary", "benchmark", "feature_matrix", "pricing_gtm", "sources"]
+
+# Benchmark score columns in --weights order.
+SCORE_COLUMNS = (
+    "traction_score",
+    "product_capability_score",
+    "monetization_score",
+    "user_sentiment_score",
+    "execution_maturity_score",
+    "evidence_confidence_score",
+)
+
+# (sheet name, rendered rows including the header, column widths)
+SheetEntry = tuple[str, list[list[Any]], tuple[float, ...]]
+
+ZIP_COMPRESSLEVEL = 1
+ZIP_WRITE_BUFFER = 1 << 20
+# Package parts under this many bytes are stored; deflate costs more than it saves.
+ZIP_STORED_MAX = 2048
+# Worksheet rows are handed to the deflate stream in batches of this many rows.
+WORKSHEET_FLUSH_ROWS = 256
+
+# Payload strings up to this length are interned; longer free text is left alone.
+INTERN_MAX_LEN = 64
+
+# Detection only needs a sample; payload text is cut off at this many chars.
+DETECTION_SAMPLE_CHARS = 16384
 
 SHEET_LAYOUT: dict[str, dict[str, Any]] = {
     "summary": {
-        "columns": [
+        "columns": (
             "problem_statement",
             "target_segment",
             "method",
             "scope",
             "top_findings",
             "strategic_implications",
-        ],
-        "widths": [34, 24, 18, 20, 48, 48],
+        ),
+        "widths": (34, 24, 18, 20, 48, 48),
+        "types": ("s", "s", "s", "s", "s", "s"),
     },
     "benchmark": {
-        "columns": [
+        "columns": (
             "rank",
             "company_product",
             "category",
@@ -49,11 +79,15 @@ SHEET_LAYOUT: dict[str, dict[str, Any]] = {
             "key_strength",
             "key_weakness",
             "threat_level",
-        ],
-        "widths": [8, 26, 30, 20, 26, 16, 14, 16, 20, 18, 18, 20, 20, 18, 28, 28, 14],
+        ),
+        "widths": (8, 26, 30, 20, 26, 16, 14, 16, 20, 18, 18, 20, 20, 18, 28, 28, 14),
+        "types": (
+            "n", "s", "s", "s", "s", "s", "s", "n", "n",
+            "n", "n", "n", "n", "n", "s", "s", "s",
+        ),
     },
     "feature_matrix": {
-        "columns": [
+        "columns": (
             "l1_capability",
             "l2_module",
             "l3_feature",
@@ -62,11 +96,12 @@ SHEET_LAYOUT: dict[str, dict[str, Any]] = {
             "parity_gap",
             "importance",
             "priority",
-        ],
-        "widths": [24, 22, 34, 30, 24, 18, 18, 18],
+        ),
+        "widths": (24, 22, 34, 30, 24, 18, 18, 18),
+        "types": ("s", "s", "s", "s", "n", "s", "s", "s"),
     },
     "pricing_gtm": {
-        "columns": [
+        "columns": (
             "product",
             "pricing_model",
             "entry_price",
@@ -76,11 +111,12 @@ SHEET_LAYOUT: dict[str, dict[str, Any]] = {
             "primary_channel",
             "positioning_claim",
             "observed_conversion_frictions",
-        ],
-        "widths": [22, 20, 14, 14, 18, 18, 32, 36, 36],
+        ),
+        "widths": (22, 20, 14, 14, 18, 18, 32, 36, 36),
+        "types": ("s", "s", "n", "n", "s", "s", "s", "s", "s"),
     },
     "sources": {
-        "columns": [
+        "columns": (
             "product",
             "source_type",
             "url",
@@ -90,11 +126,14 @@ SHEET_LAYOUT: dict[str, dict[str, Any]] = {
             "claim",
             "evidence_snippet",
             "confidence",
-        ],
-        "widths": [24, 28, 46, 32, 16, 14, 34, 46, 18],
+        ),
+        "widths": (24, 28, 46, 32, 16, 14, 34, 46, 18),
+        "types": ("s", "s", "s", "s", "s", "s", "s", "s", "s"),
     },
 }
 
+# English is the complete base locale. Other languages list only the labels
+# that differ from English; get_locale() fills in the rest.
 LOCALES: dict[str, dict[str, Any]] = {
     "en": {
         "sheet_names": {
@@ -354,7 +393,6 @@ LOCALES: dict[str, dict[str, Any]] = {
             "positioning_claim": "ポジショニング",
             "observed_conversion_frictions": "転換障壁",
             "source_type": "ソース種別(公式/ストア/レビュー/メディア/調査)",
-            "url": "URL",
             "title": "タイトル",
             "published_date": "公開日",
             "access_date": "アクセス日",
@@ -458,7 +496,6 @@ LOCALES: dict[str, dict[str, Any]] = {
             "positioning_claim": "포지셔닝",
             "observed_conversion_frictions": "전환 저해 요인",
             "source_type": "출처 유형(공식/스토어/리뷰/미디어/리서치)",
-            "url": "URL",
             "title": "제목",
             "published_date": "게시일",
             "access_date": "접근일",
@@ -515,7 +552,6 @@ LOCALES: dict[str, dict[str, Any]] = {
     "es": {
         "sheet_names": {
             "summary": "Resumen",
-            "benchmark": "Benchmark",
             "feature_matrix": "Matriz de Funciones",
             "pricing_gtm": "Precios-GTM",
             "sources": "Fuentes",
@@ -562,7 +598,6 @@ LOCALES: dict[str, dict[str, Any]] = {
             "positioning_claim": "Propuesta de Posicionamiento",
             "observed_conversion_frictions": "Fricciones de Conversión Observadas",
             "source_type": "Tipo de Fuente(Official/Store/Review/Media/Research)",
-            "url": "URL",
             "title": "Título",
             "published_date": "Fecha de Publicación",
             "access_date": "Fecha de Acceso",
@@ -619,10 +654,8 @@ LOCALES: dict[str, dict[str, Any]] = {
     "fr": {
         "sheet_names": {
             "summary": "Résumé",
-            "benchmark": "Benchmark",
             "feature_matrix": "Matrice Fonctionnelle",
             "pricing_gtm": "Prix-GTM",
-            "sources": "Sources",
         },
         "headers": {
             "problem_statement": "Définition du Problème",
@@ -654,7 +687,6 @@ LOCALES: dict[str, dict[str, Any]] = {
             "our_status": "Notre Statut(None/Planned/Live)",
             "competitor_coverage": "Couverture Concurrent(0/1)",
             "parity_gap": "Écart de Parité",
-            "importance": "Importance(H/M/L)",
             "priority": "Priorité",
             "product": "Produit",
             "pricing_model": "Modèle Tarifaire",
@@ -666,7 +698,6 @@ LOCALES: dict[str, dict[str, Any]] = {
             "positioning_claim": "Promesse de Positionnement",
             "observed_conversion_frictions": "Friction de Conversion Observée",
             "source_type": "Type de Source(Official/Store/Review/Media/Research)",
-            "url": "URL",
             "title": "Titre",
             "published_date": "Date de Publication",
             "access_date": "Date d'Accès",
@@ -699,11 +730,7 @@ LOCALES: dict[str, dict[str, Any]] = {
         ],
         "enum": {
             "threat": {"high": "Élevé", "medium": "Moyen", "low": "Faible"},
-            "category": {
-                "direct": "Direct",
-                "adjacent": "Adjacent",
-                "substitute": "Substitut",
-            },
+            "category": {"substitute": "Substitut"},
             "confidence": {"high": "Haut", "med": "Moyen", "low": "Bas"},
             "our_status": {"none": "Aucun", "planned": "Planifié", "live": "En ligne"},
             "parity_gap": {
@@ -715,7 +742,6 @@ LOCALES: dict[str, dict[str, Any]] = {
         },
         "warnings": {
             "title": "Avertissements:",
-            "sources_lt3": "[WARN] {name}: sources < 3",
             "missing_official": "[WARN] {name}: source officielle manquante",
             "missing_third": "[WARN] {name}: source tierce manquante",
         },
@@ -723,9 +749,6 @@ LOCALES: dict[str, dict[str, Any]] = {
     "de": {
         "sheet_names": {
             "summary": "Zusammenfassung",
-            "benchmark": "Benchmark",
-            "feature_matrix": "Feature-Matrix",
-            "pricing_gtm": "Pricing-GTM",
             "sources": "Quellen",
         },
         "headers": {
@@ -754,7 +777,6 @@ LOCALES: dict[str, dict[str, Any]] = {
             "threat_level": "Bedrohungsgrad",
             "l1_capability": "L1 Fähigkeit",
             "l2_module": "L2 Modul",
-            "l3_feature": "L3 Feature",
             "our_status": "Unser Status(None/Planned/Live)",
             "competitor_coverage": "Wettbewerbsabdeckung(0/1)",
             "parity_gap": "Paritätslücke",
@@ -770,7 +792,6 @@ LOCALES: dict[str, dict[str, Any]] = {
             "positioning_claim": "Positionierungsversprechen",
             "observed_conversion_frictions": "Beobachtete Conversion-Hürden",
             "source_type": "Quellentyp(Official/Store/Review/Media/Research)",
-            "url": "URL",
             "title": "Titel",
             "published_date": "Veröffentlichungsdatum",
             "access_date": "Abrufdatum",
@@ -809,7 +830,7 @@ LOCALES: dict[str, dict[str, Any]] = {
                 "substitute": "Ersatz",
             },
             "confidence": {"high": "Hoch", "med": "Mittel", "low": "Niedrig"},
-            "our_status": {"none": "Kein", "planned": "Geplant", "live": "Live"},
+            "our_status": {"none": "Kein", "planned": "Geplant"},
             "parity_gap": {
                 "lead": "Vorsprung",
                 "parity": "Parität",
@@ -856,7 +877,14 @@ ENUM_CANONICAL: dict[str, dict[str, list[str]]] = {
     },
 }
 
-SOURCE_TYPE_TOKENS = {
+# Output columns that hold an enum, per sheet, with the enum kind they use.
+LOCALIZED_ENUM_COLUMNS: dict[str, tuple[tuple[str, str], ...]] = {
+    "benchmark": (("category", "category"), ("threat_level", "threat")),
+    "sources": (("confidence", "confidence"),),
+    "feature_matrix": (("our_status", "our_status"), ("parity_gap", "parity_gap")),
+}
+
+SOURCE_TYPE_TOKENS: dict[str, list[str]] = {
     "official": ["official", "官网", "官方", "公式", "공식"],
     "store": ["store", "appstore", "play", "商店", "스토어"],
     "review": ["review", "评测", "レビュー", "리뷰"],
@@ -864,14 +892,42 @@ SOURCE_TYPE_TOKENS = {
     "research": ["research", "报告", "研究", "リサーチ", "연구"],
 }
 
-LANG_TOKEN_HINTS = {
+THIRD_PARTY_SOURCE_TYPES = frozenset({"store", "review", "media", "research"})
+
+_XML_ESCAPE_TABLE = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&apos;"}
+)
+_NEEDS_ESCAPE_RE = re.compile(r"[&<>\"']")
+
+# Numeric text accepted by to_cell_number: ASCII digits only, no "_" separators.
+_INT_TEXT_RE = re.compile(r"[+-]?[0-9]+")
+_DECIMAL_TEXT_RE = re.compile(r"[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?")
+
+# Deletes every ASCII character that is not a letter or digit (norm_key fast path).
+_ASCII_NON_ALNUM_TABLE = dict.fromkeys(c for c in range(0x80) if not chr(c).isalnum())
+
+# One pattern per script block. Each matches whole runs, so findall hands back
+# few strings even on long CJK text; the run lengths add up to the char count.
+_HAN_RUN_RE = re.compile("[\u4e00-\u9fff]+")
+_KANA_RUN_RE = re.compile("[\u3040-\u30ff]+")
+_HANGUL_RUN_RE = re.compile("[\uac00-\ud7af]+")
+_LATIN_RUN_RE = re.compile("[A-Za-z]+")
+
+LANG_TOKEN_HINTS: dict[str, set[str]] = {
     "es": {"de", "la", "para", "con", "que", "los", "las", "una", "por"},
     "fr": {"le", "la", "les", "de", "des", "et", "pour", "avec", "une"},
     "de": {"und", "der", "die", "das", "mit", "für", "ein", "eine", "nicht"},
 }
 
+_LATIN_TOKEN_RE = re.compile(r"[a-zA-ZÀ-ÿ]+")
+# Hint token -> every language it counts towards ("de" and "la" are shared).
+_LANG_HINT_INDEX: dict[str, tuple[str, ...]] = {
+    token: tuple(lang for lang, hints in LANG_TOKEN_HINTS.items() if token in hints)
+    for token in set().union(*LANG_TOKEN_HINTS.values())
+}
+
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Build competitive benchmark XLSX")
     parser.add_argument("--output", required=True, type=Path, help="Output XLSX path")
     parser.add_argument("--input-json", type=Path, help="Structured input JSON path")
@@ -899,11 +955,44 @@ def parse_args() -> argparse.Namespace:
         choices=["brief", "input", "both"],
         help="Text source used for automatic language detection",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        default=ZIP_COMPRESSLEVEL,
+        choices=range(10),
+        metavar="0-9",
+        help=(
+            "Deflate level for package parts of 2 KB (2048 bytes) or more, such as worksheets "
+            "and shared strings (0 stores them uncompressed, 9 is smallest). "
+            "Default: 1"
+        ),
+    )
+    return parser.parse_args(argv)
 
 
+@functools.lru_cache(maxsize=4096)
 def norm_key(text: str) -> str:
-    return "".join(ch.lower() for ch in str(text) if ch.isalnum())
+    s = str(text)
+    if s.isascii():
+        return s.translate(_ASCII_NON_ALNUM_TABLE).lower()
+    return "".join(ch.lower() for ch in s if ch.isalnum())
+
+
+def build_enum_lookup() -> dict[str, dict[str, str]]:
+    """Invert ENUM_CANONICAL into kind -> normalized token -> canonical value."""
+    lookup: dict[str, dict[str, str]] = {}
+    for kind, table in ENUM_CANONICAL.items():
+        index = lookup.setdefault(kind, {})
+        for canonical, variants in table.items():
+            for token in variants:
+                index.setdefault(norm_key(token), canonical)
+    return lookup
+
+
+ENUM_LOOKUP = build_enum_lookup()
+SOURCE_TYPE_KEYS: dict[str, list[str]] = {
+    kind: [norm_key(t) for t in tokens] for kind, tokens in SOURCE_TYPE_TOKENS.items()
+}
 
 
 def to_float(value: Any) -> float | None:
@@ -920,6 +1009,30 @@ def to_float(value: Any) -> float | None:
         return None
 
 
+def to_cell_number(value: Any) -> Any:
+    """Return numeric text such as "4.5" as a number; leave anything else as-is.
+
+    Only plain ASCII decimals convert; "nan", "inf" and "1_000" stay text.
+    Integer text goes through int() so long digit strings are kept exactly,
+    and text that overflows a float ("1e400") is kept as typed.
+
+    Non-string values pass through untouched. Deciding which values may be
+    written as <v> number cells is write_worksheet's job: it writes booleans
+    and non-finite floats, from this or any other column, as text.
+    """
+    if not isinstance(value, str):
+        return value
+    s = value.strip()
+    if _INT_TEXT_RE.fullmatch(s):
+        return int(s)
+    if not _DECIMAL_TEXT_RE.fullmatch(s):
+        return value
+    num = float(s)
+    if not math.isfinite(num):
+        return value
+    return int(num) if num.is_integer() and abs(num) < 2**53 else num
+
+
 def parse_weights(raw: str) -> list[float]:
     parts = [p.strip() for p in raw.split(",") if p.strip()]
     if len(parts) != 6:
@@ -930,6 +1043,13 @@ def parse_weights(raw: str) -> list[float]:
     return weights
 
 
+def _xml_escape(text: str) -> str:
+    if not _NEEDS_ESCAPE_RE.search(text):
+        return text
+    return text.translate(_XML_ESCAPE_TABLE)
+
+
+@functools.lru_cache(maxsize=None)
 def col_to_letter(n: int) -> str:
     s = ""
     while n > 0:
@@ -938,21 +1058,59 @@ def col_to_letter(n: int) -> str:
     return s
 
 
+def intern_strings(value: Any) -> Any:
+    """Intern short strings in a decoded JSON tree.
+
+    Enum-like values ("Direct", "High", "Live") repeat on every row; sharing one
+    object per value saves memory and makes later dict probes compare by
+    identity first.
+    """
+    if isinstance(value, str):
+        return sys.intern(value) if len(value) <= INTERN_MAX_LEN else value
+    if isinstance(value, dict):
+        return {sys.intern(k): intern_strings(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [intern_strings(v) for v in value]
+    return value
+
+
 def load_payload(path: Path | None) -> dict[str, Any]:
     if not path:
         return {}
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    # json.loads decodes UTF-8/16/32 bytes itself, so skip the text file layer.
+    return intern_strings(json.loads(path.read_bytes()))
 
 
+@functools.lru_cache(maxsize=None)
 def get_locale(lang: str) -> dict[str, Any]:
-    if lang in LOCALES:
-        return LOCALES[lang]
-    return LOCALES["en"]
+    """Return the locale for lang merged over the English base.
+
+    Non-English entries in LOCALES only carry labels that differ from English,
+    so each section falls back to LOCALES["en"] key by key.
+    """
+    base = LOCALES["en"]
+    overrides = LOCALES.get(lang)
+    if overrides is None or overrides is base:
+        return base
+    merged: dict[str, Any] = {}
+    for section, base_value in base.items():
+        value = overrides.get(section)
+        if value is None:
+            merged[section] = base_value
+        elif section == "enum":
+            merged[section] = {
+                kind: {**labels, **value.get(kind, {})}
+                for kind, labels in base_value.items()
+            }
+        elif isinstance(base_value, dict):
+            merged[section] = {**base_value, **value}
+        else:
+            merged[section] = value
+    return merged
 
 
 def build_scope_text(args: argparse.Namespace) -> str:
-    scope_parts = []
+    scope_parts: list[str] = []
     if args.project_path:
         scope_parts.append(f"project={args.project_path}")
     if args.brief:
@@ -991,29 +1149,42 @@ def extract_detection_text(
     if args.lang_source in ("brief", "both") and args.brief.strip():
         parts.append(args.brief)
     if args.lang_source in ("input", "both") and payload:
-        parts.append(json.dumps(payload, ensure_ascii=False))
+        parts.append(" ".join(iter_payload_text(payload, DETECTION_SAMPLE_CHARS)))
     return "\n".join(parts)
 
 
+def iter_payload_text(value: Any, budget: int) -> Iterator[str]:
+    """Yield keys and string leaves in document order, `budget` chars in total.
+
+    A leaf that crosses the budget is cut short. JSON true/false/null are
+    yielded as their literals, as json.dumps used to feed them to detection.
+    """
+    stack = [value]
+    while stack and budget > 0:
+        node = stack.pop()
+        if isinstance(node, str):
+            node = node[:budget]
+            budget -= len(node)
+            yield node
+        elif node is None or isinstance(node, bool):
+            stack.append("null" if node is None else "true" if node else "false")
+        elif isinstance(node, dict):
+            for key, child in reversed(node.items()):
+                stack.append(child)
+                stack.append(key)
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+
+@functools.lru_cache(maxsize=16)
 def detect_language(text: str) -> str:
     if not text.strip():
         return "en"
 
-    count_han = 0
-    count_kana = 0
-    count_hangul = 0
-    count_latin = 0
-
-    for ch in text:
-        code = ord(ch)
-        if 0x3040 <= code <= 0x30FF:
-            count_kana += 1
-        elif 0xAC00 <= code <= 0xD7AF:
-            count_hangul += 1
-        elif 0x4E00 <= code <= 0x9FFF:
-            count_han += 1
-        elif ("a" <= ch.lower() <= "z"):
-            count_latin += 1
+    count_han = sum(map(len, _HAN_RUN_RE.findall(text)))
+    count_kana = sum(map(len, _KANA_RUN_RE.findall(text)))
+    count_hangul = sum(map(len, _HANGUL_RUN_RE.findall(text)))
+    count_latin = sum(map(len, _LATIN_RUN_RE.findall(text)))
 
     major_scripts = sorted(
         [
@@ -1042,14 +1213,13 @@ def detect_language(text: str) -> str:
     if count_latin == 0:
         return "en"
 
-    tokens = re.findall(r"[a-zA-ZÀ-ÿ]+", text.lower())
-    lang_scores = {"es": 0, "fr": 0, "de": 0}
-    for t in tokens:
-        for lang, hints in LANG_TOKEN_HINTS.items():
-            if t in hints:
-                lang_scores[lang] += 1
+    # Insertion order is the tie-break order for max() below.
+    lang_scores: dict[str, int] = dict.fromkeys(LANG_TOKEN_HINTS, 0)
+    for t in _LATIN_TOKEN_RE.findall(text.lower()):
+        for lang in _LANG_HINT_INDEX.get(t, ()):
+            lang_scores[lang] += 1
 
-    best_lang = max(lang_scores, key=lang_scores.get)
+    best_lang = max(lang_scores, key=lang_scores.__getitem__)
     if lang_scores[best_lang] >= 2:
         return best_lang
     return "en"
@@ -1065,59 +1235,80 @@ def choose_language(args: argparse.Namespace, payload: dict[str, Any]) -> str:
 
 
 def sheet_header(lang: str, col_key: str) -> str:
-    locale = get_locale(lang)
-    return locale["headers"].get(col_key, LOCALES["en"]["headers"].get(col_key, col_key))
+    return get_locale(lang)["headers"].get(col_key, col_key)
+
+
+@functools.lru_cache(maxsize=None)
+def sheet_headers(lang: str, sheet_key: str) -> tuple[str, ...]:
+    return tuple(sheet_header(lang, c) for c in SHEET_LAYOUT[sheet_key]["columns"])
 
 
+@functools.lru_cache(maxsize=None)
 def sheet_name(lang: str, sheet_key: str) -> str:
-    locale = get_locale(lang)
-    return locale["sheet_names"].get(sheet_key, LOCALES["en"]["sheet_names"][sheet_key])
+    return get_locale(lang)["sheet_names"][sheet_key]
+
 
+@functools.lru_cache(maxsize=None)
+def build_sheet_aliases() -> dict[str, str]:
+    """Map every normalized sheet alias to its canonical sheet key.
 
-def build_sheet_aliases() -> dict[str, list[str]]:
+    Built once from the layout and locale tables; callers must not mutate it.
+    """
     aliases: dict[str, set[str]] = {k: set() for k in SHEET_ORDER}
     for key in SHEET_ORDER:
         aliases[key].update({key, key.replace("_", "-"), key.replace("_", "")})
-        for loc in LOCALES.values():
-            aliases[key].add(loc["sheet_names"][key])
-    return {k: [norm_key(x) for x in v if x] for k, v in aliases.items()}
+        for lang in LOCALES:
+            aliases[key].add(get_locale(lang)["sheet_names"][key])
 
+    lookup: dict[str, str] = {}
+    for key in SHEET_ORDER:
+        for alias in aliases[key]:
+            if alias:
+                lookup.setdefault(norm_key(alias), key)
+    return lookup
 
-def canonical_sheet_key(raw_key: str, sheet_aliases: dict[str, list[str]]) -> str | None:
-    nk = norm_key(raw_key)
-    for key, values in sheet_aliases.items():
-        if nk in values:
-            return key
-    return None
 
+def canonical_sheet_key(raw_key: str, sheet_aliases: dict[str, str]) -> str | None:
+    return sheet_aliases.get(norm_key(raw_key))
 
-def get_payload_rows(
-    payload: dict[str, Any], sheet_key: str, sheet_aliases: dict[str, list[str]]
-) -> list[dict[str, Any]]:
+
+def index_payload_rows(
+    payload: dict[str, Any], sheet_aliases: dict[str, str]
+) -> dict[str, list[dict[str, Any]]]:
+    """Group payload rows by canonical sheet in one pass over the payload keys.
+
+    The first list-valued key that resolves to a sheet wins; later aliases of
+    the same sheet are ignored.
+    """
+    by_sheet: dict[str, list[dict[str, Any]]] = {}
     for k, v in payload.items():
+        if not isinstance(v, list):
+            continue
         canonical = canonical_sheet_key(k, sheet_aliases)
-        if canonical == sheet_key and isinstance(v, list):
-            return [x for x in v if isinstance(x, dict)]
-    return []
+        if canonical is not None and canonical not in by_sheet:
+            by_sheet[canonical] = [x for x in v if isinstance(x, dict)]
+    return by_sheet
 
 
-def build_column_aliases() -> dict[str, dict[str, list[str]]]:
+@functools.lru_cache(maxsize=None)
+def build_column_aliases() -> dict[str, dict[str, str]]:
+    """Map each sheet's normalized column aliases to their canonical column.
+
+    Built once from the layout and locale tables; callers must not mutate it.
+    """
     aliases: dict[str, dict[str, set[str]]] = {
         sheet: {col: {col} for col in conf["columns"]}
         for sheet, conf in SHEET_LAYOUT.items()
     }
 
-    for sheet_key, conf in SHEET_LAYOUT.items():
-        for col in conf["columns"]:
-            aliases[sheet_key][col].add(LOCALES["en"]["headers"][col])
-
-    for locale in LOCALES.values():
+    for lang in LOCALES:
+        headers = get_locale(lang)["headers"]
         for sheet_key, conf in SHEET_LAYOUT.items():
             for col in conf["columns"]:
-                aliases[sheet_key][col].add(locale["headers"][col])
+                aliases[sheet_key][col].add(headers[col])
 
     return {
-        s: {c: [norm_key(x) for x in vals if x] for c, vals in d.items()}
+        s: {norm_key(x): c for c, vals in d.items() for x in vals if x}
         for s, d in aliases.items()
     }
 
@@ -1125,48 +1316,44 @@ def build_column_aliases() -> dict[str, dict[str, list[str]]]:
 def map_rows(
     raw_rows: list[dict[str, Any]],
     sheet_key: str,
-    column_aliases: dict[str, dict[str, list[str]]],
+    column_aliases: dict[str, dict[str, str]],
 ) -> list[dict[str, Any]]:
     mapped: list[dict[str, Any]] = []
     columns = SHEET_LAYOUT[sheet_key]["columns"]
+    alias_index = column_aliases[sheet_key]
+    # Payload rows repeat the same raw keys, so resolve each distinct key once.
+    resolved: dict[str, str | None] = {}
 
     for row in raw_rows:
-        key_map = {norm_key(k): v for k, v in row.items()}
-        out: dict[str, Any] = {}
-        for col in columns:
-            out[col] = ""
-            for alias in column_aliases[sheet_key][col]:
-                if alias in key_map:
-                    out[col] = key_map[alias]
-                    break
+        out: dict[str, Any] = dict.fromkeys(columns, "")
+        for k, v in row.items():
+            if k not in resolved:
+                resolved[k] = alias_index.get(norm_key(k))
+            col = resolved[k]
+            if col is not None:
+                out[col] = v
         mapped.append(out)
     return mapped
 
 
-def canonical_from_value(kind: str, value: Any) -> str | None:
-    if value is None:
-        return None
-    raw = norm_key(str(value))
-    if not raw:
-        return None
-    for canonical, variants in ENUM_CANONICAL.get(kind, {}).items():
-        for token in variants:
-            if norm_key(token) == raw:
-                return canonical
-    return None
+@functools.lru_cache(maxsize=None)
+def make_localizer(kind: str, lang: str) -> Callable[[Any], Any]:
+    """Return a function that maps any alias of a `kind` enum to its `lang` label."""
+    canon_index = ENUM_LOOKUP.get(kind, {})
+    labels = get_locale(lang)["enum"].get(kind, {})
+
+    def localize(value: Any) -> Any:
+        if value is None or value == "":
+            return value
+        raw = norm_key(str(value))
+        localized = labels.get(canon_index.get(raw)) if raw else None
+        return localized or value
+
+    return localize
 
 
 def localize_enum(kind: str, value: Any, lang: str) -> Any:
-    if value is None or value == "":
-        return value
-    canonical = canonical_from_value(kind, value)
-    if canonical is None:
-        return value
-    locale = get_locale(lang)
-    localized = locale["enum"].get(kind, {}).get(canonical)
-    if localized:
-        return localized
-    return value
+    return make_localizer(kind, lang)(value)
 
 
 def normalize_source_type(value: Any) -> set[str]:
@@ -1174,53 +1361,37 @@ def normalize_source_type(value: Any) -> set[str]:
         return set()
     s = norm_key(str(value))
     found: set[str] = set()
-    for k, tokens in SOURCE_TYPE_TOKENS.items():
+    for k, tokens in SOURCE_TYPE_KEYS.items():
         for t in tokens:
-            if norm_key(t) in s:
+            if t in s:
                 found.add(k)
                 break
     return found
 
 
-def localize_rows_for_output(rows: list[dict[str, Any]], sheet_key: str, lang: str) -> None:
-    if sheet_key == "benchmark":
-        for row in rows:
-            row["category"] = localize_enum("category", row.get("category"), lang)
-            row["threat_level"] = localize_enum("threat", row.get("threat_level"), lang)
-    elif sheet_key == "sources":
-        for row in rows:
-            row["confidence"] = localize_enum("confidence", row.get("confidence"), lang)
-    elif sheet_key == "feature_matrix":
-        for row in rows:
-            row["our_status"] = localize_enum("our_status", row.get("our_status"), lang)
-            row["parity_gap"] = localize_enum("parity_gap", row.get("parity_gap"), lang)
-
-
 def prepare_benchmark_rows(
     rows: list[dict[str, Any]], weights: list[float], top_n: int, lang: str
 ) -> list[dict[str, Any]]:
-    enriched: list[dict[str, Any]] = []
     for row in rows:
-        scores = [
-            to_float(row.get("traction_score")),
-            to_float(row.get("product_capability_score")),
-            to_float(row.get("monetization_score")),
-            to_float(row.get("user_sentiment_score")),
-            to_float(row.get("execution_maturity_score")),
-            to_float(row.get("evidence_confidence_score")),
-        ]
-        if all(v is not None for v in scores):
-            weighted = sum((scores[i] / 5.0) * weights[i] for i in range(6))
-            row["__weighted_value"] = round(weighted, 2)
+        scores: list[float] = []
+        for col in SCORE_COLUMNS:
+            score = to_float(row.get(col))
+            if score is None:
+                # One missing score leaves the row unscored; skip the rest.
+                row["__weighted_value"] = None
+                break
+            scores.append(score)
         else:
-            row["__weighted_value"] = None
-        enriched.append(row)
+            weighted = sum(score / 5.0 * w for score, w in zip(scores, weights))
+            row["__weighted_value"] = round(weighted, 2)
 
-    enriched.sort(
+    # Same order as a stable descending sort truncated to top_n, without sorting
+    # every row when top_n is much smaller than the payload.
+    enriched = heapq.nlargest(
+        top_n,
+        rows,
         key=lambda r: r["__weighted_value"] if r["__weighted_value"] is not None else -1,
-        reverse=True,
     )
-    enriched = enriched[:top_n]
 
     for idx, row in enumerate(enriched, start=1):
         row["rank"] = idx
@@ -1258,74 +1429,123 @@ def validate_sources(rows: list[dict[str, Any]], lang: str) -> list[str]:
             out.append(warnings["sources_lt3"].format(name=name))
         if "official" not in merged:
             out.append(warnings["missing_official"].format(name=name))
-        if not merged.intersection({"store", "review", "media", "research"}):
+        if merged.isdisjoint(THIRD_PARTY_SOURCE_TYPES):
             out.append(warnings["missing_third"].format(name=name))
     return out
 
 
-def worksheet_xml(
-    rows: list[list[Any]], widths: list[float], freeze_header: bool = True
-) -> str:
-    max_cols = max(1, max((len(r) for r in rows), default=1))
-    total_rows = max(1, len(rows))
+class SharedStrings:
+    """Workbook-wide shared strings table (xl/sharedStrings.xml).
 
-    cols_xml = []
-    for idx in range(1, max_cols + 1):
-        w = widths[idx - 1] if idx - 1 < len(widths) else 24.0
-        cols_xml.append(f'<col min="{idx}" max="{idx}" width="{w}" customWidth="1"/>')
+    Repeated labels such as headers and localized enum values are written once
+    and referenced by index from every sheet.
+    """
 
-    lines = [
-        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>',
-        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">',
-    ]
+    def __init__(self) -> None:
+        self._index: dict[str, int] = {}
+        self.strings: list[str] = []
+        self.count = 0
 
-    if freeze_header:
-        lines.append(
-            '  <sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>'
-        )
-    else:
-        lines.append('  <sheetViews><sheetView workbookViewId="0"/></sheetViews>')
+    def intern(self, text: str) -> int:
+        self.count += 1
+        idx = self._index.get(text)
+        if idx is None:
+            idx = len(self.strings)
+            self._index[text] = idx
+            self.strings.append(text)
+        return idx
 
-    lines.extend(
-        [
-            '  <sheetFormatPr defaultRowHeight="22"/>',
-            f'  <cols>{"".join(cols_xml)}</cols>',
-            f'  <dimension ref="A1:{col_to_letter(max_cols)}{total_rows}"/>',
-            '  <sheetData>',
-        ]
+
+def needs_preserve(text: str) -> bool:
+    # Slices compare without the method-call overhead of startswith/endswith.
+    return text[:1] == " " or text[-1:] == " " or "\n" in text
+
+
+_WORKSHEET_HEAD = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">\n'
+)
+_SHEET_VIEWS_FROZEN = b'  <sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>\n'
+_SHEET_VIEWS_PLAIN = b'  <sheetViews><sheetView workbookViewId="0"/></sheetViews>\n'
+
+
+@functools.lru_cache(maxsize=None)
+def cols_xml(widths: tuple[float, ...], max_cols: int) -> bytes:
+    """Return the sheetFormatPr and <cols> markup for a sheet's column widths.
+
+    Layout widths are constant tuples, so each sheet's fragment is built once.
+    """
+    cols: list[str] = []
+    for idx in range(1, max_cols + 1):
+        w = widths[idx - 1] if idx - 1 < len(widths) else 24.0
+        cols.append(f'<col min="{idx}" max="{idx}" width="{w}" customWidth="1"/>')
+    return (
+        '  <sheetFormatPr defaultRowHeight="22"/>\n'
+        f'  <cols>{"".join(cols)}</cols>\n'
+    ).encode("utf-8")
+
+
+def write_worksheet(
+    fh: IO[bytes],
+    rows: list[list[Any]],
+    widths: tuple[float, ...],
+    sst: SharedStrings,
+    freeze_header: bool = True,
+) -> None:
+    """Stream one worksheet part into fh as UTF-8, in batches of rows."""
+    max_cols = max(1, max((len(r) for r in rows), default=1))
+    total_rows = max(1, len(rows))
+
+    write = fh.write
+    write(_WORKSHEET_HEAD)
+    write(_SHEET_VIEWS_FROZEN if freeze_header else _SHEET_VIEWS_PLAIN)
+    write(cols_xml(widths, max_cols))
+    write(
+        (
+            f'  <dimension ref="A1:{col_to_letter(max_cols)}{total_rows}"/>\n'
+            "  <sheetData>\n"
+        ).encode("utf-8")
     )
 
+    # The column schema is fixed per sheet, so resolve column letters once
+    # instead of per cell.
+    col_letters = [col_to_letter(c_idx) for c_idx in range(1, max_cols + 1)]
+    pending: list[str] = []
     for r_idx, row in enumerate(rows, start=1):
-        lines.append(f'    <row r="{r_idx}" ht="22" customHeight="1">')
-        for c_idx in range(1, max_cols + 1):
-            val = row[c_idx - 1] if c_idx - 1 < len(row) else ""
-            ref = f"{col_to_letter(c_idx)}{r_idx}"
-            style = "2" if r_idx == 1 else "1"
-
+        cells = [f'    <row r="{r_idx}" ht="22" customHeight="1">']
+        append = cells.append
+        style = "2" if r_idx == 1 else "1"
+        # Everything after the column letter is fixed for the row.
+        plain = f'{r_idx}" s="{style}"'
+        shared = f'{r_idx}" t="s" s="{style}"'
+        if len(row) < max_cols:
+            row = list(row) + [""] * (max_cols - len(row))
+        for letter, val in zip(col_letters, row):
             if val is None or val == "":
-                lines.append(f'      <c r="{ref}" s="{style}"/>')
-            elif isinstance(val, (int, float)):
-                lines.append(f'      <c r="{ref}" s="{style}"><v>{val}</v></c>')
+                append(f'      <c r="{letter}{plain}/>')
+            elif type(val) is int or (type(val) is float and math.isfinite(val)):
+                # Exact type checks: bool is an int subclass, and json.loads
+                # accepts bare NaN/Infinity, but Excel rejects <v>True</v> and
+                # <v>nan</v>. Booleans and non-finite floats are written as text.
+                append(f'      <c r="{letter}{plain}><v>{val}</v></c>')
             elif isinstance(val, str) and val.startswith("="):
-                formula = escape(val[1:])
-                lines.append(f'      <c r="{ref}" s="{style}"><f>{formula}</f></c>')
+                append(f'      <c r="{letter}{plain}><f>{_xml_escape(val[1:])}</f></c>')
             else:
-                txt = str(val)
-                esc = escape(txt)
-                preserve = (
-                    ' xml:space="preserve"'
-                    if txt.startswith(" ") or txt.endswith(" ") or "\n" in txt
-                    else ""
-                )
-                lines.append(
-                    f'      <c r="{ref}" t="inlineStr" s="{style}"><is><t{preserve}>{esc}</t></is></c>'
-                )
-        lines.append("    </row>")
-
-    lines.append("  </sheetData>")
-    lines.append(f'  <autoFilter ref="A1:{col_to_letter(max_cols)}{total_rows}"/>')
-    lines.append("</worksheet>")
-    return "\n".join(lines)
+                append(f'      <c r="{letter}{shared}><v>{sst.intern(str(val))}</v></c>')
+        append("    </row>\n")
+        pending.append("\n".join(cells))
+        if len(pending) >= WORKSHEET_FLUSH_ROWS:
+            write("".join(pending).encode("utf-8"))
+            pending.clear()
+    write("".join(pending).encode("utf-8"))
+
+    write(
+        (
+            "  </sheetData>\n"
+            f'  <autoFilter ref="A1:{col_to_letter(max_cols)}{total_rows}"/>\n'
+            "</worksheet>"
+        ).encode("utf-8")
+    )
 
 
 def styles_xml() -> str:
@@ -1357,10 +1577,23 @@ def styles_xml() -> str:
 """
 
 
+def shared_strings_xml(sst: SharedStrings) -> str:
+    items: list[str] = []
+    for text in sst.strings:
+        preserve = ' xml:space="preserve"' if needs_preserve(text) else ""
+        items.append(f"  <si><t{preserve}>{_xml_escape(text)}</t></si>")
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" count="{sst.count}" uniqueCount="{len(sst.strings)}">\n'
+        + "".join(f"{item}\n" for item in items)
+        + "</sst>\n"
+    )
+
+
 def build_workbook_xml(sheet_names: list[str]) -> str:
-    sheet_lines = []
+    sheet_lines: list[str] = []
     for idx, name in enumerate(sheet_names, start=1):
-        safe_name = escape(name)
+        safe_name = _xml_escape(name)
         sheet_lines.append(
             f'    <sheet name="{safe_name}" sheetId="{idx}" r:id="rId{idx}"/>'
         )
@@ -1375,7 +1608,7 @@ def build_workbook_xml(sheet_names: list[str]) -> str:
 
 
 def build_workbook_rels(sheet_count: int) -> str:
-    rels = []
+    rels: list[str] = []
     for idx in range(1, sheet_count + 1):
         rels.append(
             f'  <Relationship Id="rId{idx}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet{idx}.xml"/>'
@@ -1383,6 +1616,9 @@ def build_workbook_rels(sheet_count: int) -> str:
     rels.append(
         f'  <Relationship Id="rId{sheet_count + 1}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
     )
+    rels.append(
+        f'  <Relationship Id="rId{sheet_count + 2}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" Target="sharedStrings.xml"/>'
+    )
     return (
         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">\n'
@@ -1395,6 +1631,7 @@ def build_content_types(sheet_count: int) -> str:
     overrides = [
         '  <Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>',
         '  <Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>',
+        '  <Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>',
         '  <Override PartName="/docProps/core.xml" ContentType="application/vnd.openxmlformats-package.core-properties+xml"/>',
         '  <Override PartName="/docProps/app.xml" ContentType="application/vnd.openxmlformats-officedocument.extended-properties+xml"/>',
     ]
@@ -1422,9 +1659,8 @@ def root_rels_xml() -> str:
 """
 
 
-def core_xml() -> str:
-    today = date.today().isoformat()
-    ts = f"{today}T00:00:00Z"
+def core_xml(build_date: date) -> str:
+    ts = f"{build_date.isoformat()}T00:00:00Z"
     return f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/" xmlns:dcmitype="http://purl.org/dc/dcmitype/" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
   <dc:creator>competitive-analysis-skill</dc:creator>
@@ -1443,20 +1679,70 @@ def app_xml() -> str:
 """
 
 
-def write_xlsx(output: Path, sheet_entries: list[tuple[str, str]]) -> None:
-    output.parent.mkdir(parents=True, exist_ok=True)
-    sheet_names = [name for name, _ in sheet_entries]
+# Package boilerplate only depends on the sheet count, which SHEET_ORDER fixes,
+# so it is rendered once at import and handed to the writer as bytes.
+CONTENT_TYPES_XML = build_content_types(len(SHEET_ORDER)).encode("utf-8")
+ROOT_RELS_XML = root_rels_xml().encode("utf-8")
+WORKBOOK_RELS_XML = build_workbook_rels(len(SHEET_ORDER)).encode("utf-8")
+STYLES_XML = styles_xml().encode("utf-8")
+APP_XML = app_xml().encode("utf-8")
+
 
-    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        zf.writestr("[Content_Types].xml", build_content_types(len(sheet_names)))
-        zf.writestr("_rels/.rels", root_rels_xml())
-        zf.writestr("xl/workbook.xml", build_workbook_xml(sheet_names))
-        zf.writestr("xl/_rels/workbook.xml.rels", build_workbook_rels(len(sheet_names)))
-        zf.writestr("xl/styles.xml", styles_xml())
-        for idx, (_, xml) in enumerate(sheet_entries, start=1):
-            zf.writestr(f"xl/worksheets/sheet{idx}.xml", xml)
-        zf.writestr("docProps/core.xml", core_xml())
-        zf.writestr("docProps/app.xml", app_xml())
+def write_part(zf: zipfile.ZipFile, name: str, data: str | bytes) -> None:
+    """Write one package part, storing it uncompressed when it is tiny."""
+    # Measure UTF-8 bytes, not chars: CJK text is up to 3 bytes per char.
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if len(data) < ZIP_STORED_MAX:
+        zf.writestr(name, data, compress_type=zipfile.ZIP_STORED)
+    else:
+        zf.writestr(name, data)
+
+
+def write_xlsx(
+    output: Path,
+    sheet_entries: Iterable[SheetEntry],
+    build_date: date,
+    compresslevel: int = ZIP_COMPRESSLEVEL,
+) -> list[str]:
+    """Write the workbook, consuming sheet entries one at a time.
+
+    Entries may come from a generator so only one sheet's rows are alive while
+    it is written. workbook.xml lists the sheet names, so it goes in after the
+    sheets; part order inside the package does not matter to readers.
+    Returns the sheet names in workbook order.
+    """
+    output.parent.mkdir(parents=True, exist_ok=True)
+    sheet_names: list[str] = []
+
+    # Sheet XML is highly repetitive, so deflate level 1 is nearly as small as
+    # the default level 6 at a fraction of the CPU. Level 0 means a stored
+    # archive: a deflate stream at level 0 only adds framing.
+    compression = zipfile.ZIP_STORED if compresslevel == 0 else zipfile.ZIP_DEFLATED
+    with open(output, "wb", buffering=ZIP_WRITE_BUFFER) as fp, zipfile.ZipFile(
+        fp,
+        "w",
+        compression=compression,
+        compresslevel=compresslevel,
+        allowZip64=True,
+    ) as zf:
+        write_part(zf, "[Content_Types].xml", CONTENT_TYPES_XML)
+        write_part(zf, "_rels/.rels", ROOT_RELS_XML)
+        write_part(zf, "xl/_rels/workbook.xml.rels", WORKBOOK_RELS_XML)
+        write_part(zf, "xl/styles.xml", STYLES_XML)
+        # Sheets stream in order on purpose: they all intern into one
+        # workbook-wide shared strings table, written once every sheet is done.
+        sst = SharedStrings()
+        for idx, (name, rows, widths) in enumerate(sheet_entries, start=1):
+            with zf.open(f"xl/worksheets/sheet{idx}.xml", "w") as fh:
+                write_worksheet(fh, rows, widths, sst)
+            sheet_names.append(name)
+        assert len(sheet_names) == len(SHEET_ORDER)
+        write_part(zf, "xl/workbook.xml", build_workbook_xml(sheet_names))
+        write_part(zf, "xl/sharedStrings.xml", shared_strings_xml(sst))
+        write_part(zf, "docProps/core.xml", core_xml(build_date))
+        write_part(zf, "docProps/app.xml", APP_XML)
+    return sheet_names
 
 
 def to_sheet_rows(
@@ -1465,133 +1751,117 @@ def to_sheet_rows(
     lang: str,
     weights: list[float] | None = None,
 ) -> list[list[Any]]:
-    columns = SHEET_LAYOUT[sheet_key]["columns"]
-    header = [sheet_header(lang, c) for c in columns]
-    data_rows: list[list[Any]] = [header]
+    layout = SHEET_LAYOUT[sheet_key]
+    columns = layout["columns"]
+    localizers = {
+        col: make_localizer(kind, lang)
+        for col, kind in LOCALIZED_ENUM_COLUMNS.get(sheet_key, ())
+    }
+    # One converter per column, applied while the row is emitted: enum
+    # columns are localized, numeric columns coerced, the rest passed through.
+    converters = [
+        (c, localizers.get(c) or (to_cell_number if t == "n" else None))
+        for c, t in zip(columns, layout["types"])
+    ]
+    data_rows: list[list[Any]] = [list(sheet_headers(lang, sheet_key))]
 
     if sheet_key != "benchmark":
-        localize_rows_for_output(rows, sheet_key, lang)
         for item in rows:
-            data_rows.append([item.get(c, "") for c in columns])
+            data_rows.append(
+                [fn(item.get(c, "")) if fn else item.get(c, "") for c, fn in converters]
+            )
         return data_rows
 
-    # Benchmark keeps formula for weighted_total
+    # Benchmark keeps formula for weighted_total. Weights are fixed for the run,
+    # so only the row number is left to fill in per row.
     assert weights is not None
-    localize_rows_for_output(rows, sheet_key, lang)
+    formula_tmpl = (
+        "=ROUND("
+        + "+".join(f"{col}{{i}}/5*{w}" for col, w in zip("HIJKLM", weights))
+        + ",2)"
+    )
+    total_idx = columns.index("weighted_total")
     for idx, item in enumerate(rows, start=2):
-        line: list[Any] = []
-        for c in columns:
-            if c == "weighted_total":
-                scores = [
-                    to_float(item.get("traction_score")),
-                    to_float(item.get("product_capability_score")),
-                    to_float(item.get("monetization_score")),
-                    to_float(item.get("user_sentiment_score")),
-                    to_float(item.get("execution_maturity_score")),
-                    to_float(item.get("evidence_confidence_score")),
-                ]
-                if all(v is not None for v in scores):
-                    formula = (
-                        f"=ROUND(H{idx}/5*{weights[0]}+I{idx}/5*{weights[1]}+"
-                        f"J{idx}/5*{weights[2]}+K{idx}/5*{weights[3]}+"
-                        f"L{idx}/5*{weights[4]}+M{idx}/5*{weights[5]},2)"
-                    )
-                    line.append(formula)
-                else:
-                    line.append(item.get(c, ""))
-            else:
-                line.append(item.get(c, ""))
+        line = [fn(item.get(c, "")) if fn else item.get(c, "") for c, fn in converters]
+        # prepare_benchmark_rows leaves None when any score is missing.
+        if item["__weighted_value"] is not None:
+            line[total_idx] = formula_tmpl.format(i=idx)
         data_rows.append(line)
 
     return data_rows
 
 
-def main() -> None:
-    args = parse_args()
+def render_sheet(
+    sheet_key: str,
+    rows: list[dict[str, Any]],
+    lang: str,
+    weights: list[float] | None = None,
+) -> SheetEntry:
+    sheet_rows = to_sheet_rows(sheet_key, rows, lang, weights=weights)
+    return sheet_name(lang, sheet_key), sheet_rows, SHEET_LAYOUT[sheet_key]["widths"]
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    build_date = date.today()
     weights = parse_weights(args.weights)
     payload = load_payload(args.input_json)
 
     selected_lang = choose_language(args, payload)
 
-    sheet_aliases = build_sheet_aliases()
+    payload_rows = index_payload_rows(payload, build_sheet_aliases())
     column_aliases = build_column_aliases()
 
-    summary_raw = get_payload_rows(payload, "summary", sheet_aliases)
+    summary_raw = payload_rows.get("summary", [])
     if summary_raw:
         summary_rows_data = map_rows(summary_raw, "summary", column_aliases)
     else:
         summary_rows_data = build_default_summary(args, selected_lang)
 
-    benchmark_raw = get_payload_rows(payload, "benchmark", sheet_aliases)
+    benchmark_raw = payload_rows.get("benchmark", [])
     benchmark_rows_data = map_rows(benchmark_raw, "benchmark", column_aliases)
     benchmark_rows_data = prepare_benchmark_rows(
         benchmark_rows_data, weights, args.top_n, selected_lang
     )
 
-    feature_raw = get_payload_rows(payload, "feature_matrix", sheet_aliases)
+    feature_raw = payload_rows.get("feature_matrix", [])
     feature_rows_data = map_rows(feature_raw, "feature_matrix", column_aliases)
 
-    pricing_raw = get_payload_rows(payload, "pricing_gtm", sheet_aliases)
+    pricing_raw = payload_rows.get("pricing_gtm", [])
     pricing_rows_data = map_rows(pricing_raw, "pricing_gtm", column_aliases)
 
-    sources_raw = get_payload_rows(payload, "sources", sheet_aliases)
+    sources_raw = payload_rows.get("sources", [])
     sources_rows_data = map_rows(sources_raw, "sources", column_aliases)
 
     warnings = validate_sources(sources_rows_data, selected_lang)
 
-    sheet_entries: list[tuple[str, str]] = []
-
-    summary_rows = to_sheet_rows("summary", summary_rows_data, selected_lang)
-    sheet_entries.append(
-        (sheet_name(selected_lang, "summary"), worksheet_xml(summary_rows, SHEET_LAYOUT["summary"]["widths"]))
-    )
-
-    benchmark_rows = to_sheet_rows(
-        "benchmark", benchmark_rows_data, selected_lang, weights=weights
-    )
-    sheet_entries.append(
-        (
-            sheet_name(selected_lang, "benchmark"),
-            worksheet_xml(benchmark_rows, SHEET_LAYOUT["benchmark"]["widths"]),
-        )
-    )
-
-    feature_rows = to_sheet_rows("feature_matrix", feature_rows_data, selected_lang)
-    sheet_entries.append(
-        (
-            sheet_name(selected_lang, "feature_matrix"),
-            worksheet_xml(feature_rows, SHEET_LAYOUT["feature_matrix"]["widths"]),
-        )
-    )
-
-    pricing_rows = to_sheet_rows("pricing_gtm", pricing_rows_data, selected_lang)
-    sheet_entries.append(
-        (
-            sheet_name(selected_lang, "pricing_gtm"),
-            worksheet_xml(pricing_rows, SHEET_LAYOUT["pricing_gtm"]["widths"]),
-        )
+    sheet_data = {
+        "summary": summary_rows_data,
+        "benchmark": benchmark_rows_data,
+        "feature_matrix": feature_rows_data,
+        "pricing_gtm": pricing_rows_data,
+        "sources": sources_rows_data,
+    }
+    sheet_entries = (
+        render_sheet(key, sheet_data[key], selected_lang, weights=weights)
+        for key in SHEET_ORDER
     )
 
-    sources_rows = to_sheet_rows("sources", sources_rows_data, selected_lang)
-    sheet_entries.append(
-        (
-            sheet_name(selected_lang, "sources"),
-            worksheet_xml(sources_rows, SHEET_LAYOUT["sources"]["widths"]),
-        )
+    sheet_names = write_xlsx(
+        args.output, sheet_entries, build_date, compresslevel=args.compress_level
     )
 
-    write_xlsx(args.output, sheet_entries)
-
-    print(f"Written: {args.output}")
-    print(f"Language: {selected_lang}")
-    print("Sheets:", ", ".join(name for name, _ in sheet_entries))
-    print(f"Benchmark rows: {max(len(benchmark_rows) - 1, 0)}")
-
+    # Status and warnings go out in one write.
+    lines = [
+        f"Written: {args.output}",
+        f"Language: {selected_lang}",
+        f"Sheets: {', '.join(sheet_names)}",
+        f"Benchmark rows: {len(benchmark_rows_data)}",
+    ]
     if warnings:
-        warn_title = get_locale(selected_lang)["warnings"]["title"]
-        print(warn_title)
-        for msg in warnings:
-            print(msg)
+        lines.append(get_locale(selected_lang)["warnings"]["title"])
+        lines.extend(warnings)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
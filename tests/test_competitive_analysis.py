@@ -1,71 +1,275 @@
 from __future__ import annotations
 
-import subprocess
+import contextlib
+import importlib.util
+import io
+import json
+import re
 import tempfile
 import unittest
 import zipfile
 from pathlib import Path
+from xml.etree import ElementTree
+
+SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "build_benchmark_xlsx.py"
+_spec = importlib.util.spec_from_file_location("build_benchmark_xlsx", SCRIPT)
+build_benchmark_xlsx = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(build_benchmark_xlsx)
+
+ZH_BRIEF = "这是一个用于家庭做饭规划的AI产品，包含备菜和库存管理。"
+SHEET_NAME_RE = re.compile(r'<sheet name="([^"]*)"')
 
 
 class CompetitiveAnalysisTest(unittest.TestCase):
-    def setUp(self) -> None:
-        self.root = Path(__file__).resolve().parents[1]
-        self.script = self.root / "scripts" / "build_benchmark_xlsx.py"
+    @classmethod
+    def setUpClass(cls) -> None:
+        # Workbooks that several tests only read are built once per class.
+        cls._tmp = tempfile.TemporaryDirectory()
+        tmp = Path(cls._tmp.name)
+        cls.xlsx_zh = tmp / "benchmark-zh.xlsx"
+        cls._build(
+            "--output",
+            str(cls.xlsx_zh),
+            "--brief",
+            ZH_BRIEF,
+            "--lang",
+            "auto",
+            "--lang-source",
+            "brief",
+        )
+        cls.xlsx_en = tmp / "benchmark-en.xlsx"
+        cls._build("--output", str(cls.xlsx_en), "--brief", ZH_BRIEF, "--lang", "en")
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._tmp.cleanup()
+
+    @classmethod
+    def _build(cls, *argv: str) -> str:
+        """Run the CLI in-process and return what it printed."""
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            build_benchmark_xlsx.main(list(argv))
+        return out.getvalue()
 
-    def _read_zip_text(self, xlsx: Path, member: str) -> str:
+    def _read_xlsx_parts(self, xlsx: Path) -> dict[str, str]:
+        """Read every package part as text with a single archive open."""
         with zipfile.ZipFile(xlsx, "r") as zf:
-            return zf.read(member).decode("utf-8")
+            return {name: zf.read(name).decode("utf-8") for name in zf.namelist()}
 
     def test_auto_lang_zh_sheet_names(self) -> None:
-        with tempfile.TemporaryDirectory() as td:
-            out = Path(td) / "benchmark.xlsx"
-            subprocess.run(
-                [
-                    "python3",
-                    str(self.script),
+        workbook_xml = self._read_xlsx_parts(self.xlsx_zh)["xl/workbook.xml"]
+        self.assertEqual(
+            SHEET_NAME_RE.findall(workbook_xml),
+            ["摘要", "竞品基准", "功能矩阵", "定价-GTM", "证据来源"],
+        )
+
+    def test_force_en_sheet_names(self) -> None:
+        workbook_xml = self._read_xlsx_parts(self.xlsx_en)["xl/workbook.xml"]
+        self.assertEqual(
+            SHEET_NAME_RE.findall(workbook_xml),
+            ["Summary", "Benchmark", "Feature-Matrix", "Pricing-GTM", "Sources"],
+        )
+
+    def test_auto_lang_detected_from_input_payload(self) -> None:
+        ja_text = "家庭の献立を計画するためのアプリです。"
+        cases = {
+            "short": {"summary": [{"problem_statement": ja_text, "method": True}]},
+            # One huge leaf: detection must sample it, not copy all of it.
+            "long_leaf": {"summary": [{"top_findings": ja_text * 50_000}]},
+        }
+        for label, payload in cases.items():
+            with self.subTest(label), tempfile.TemporaryDirectory() as td:
+                out = Path(td) / "benchmark.xlsx"
+                payload_path = Path(td) / "input.json"
+                payload_path.write_text(json.dumps(payload), encoding="utf-8")
+                printed = self._build(
                     "--output",
                     str(out),
-                    "--brief",
-                    "这是一个用于家庭做饭规划的AI产品，包含备菜和库存管理。",
+                    "--input-json",
+                    str(payload_path),
                     "--lang",
                     "auto",
                     "--lang-source",
-                    "brief",
-                ],
-                check=True,
+                    "input",
+                )
+
+                self.assertIn("Language: ja", printed)
+                workbook_xml = self._read_xlsx_parts(out)["xl/workbook.xml"]
+                self.assertEqual(SHEET_NAME_RE.findall(workbook_xml)[0], "サマリー")
+
+                args = build_benchmark_xlsx.parse_args(
+                    ["--output", str(out), "--lang-source", "input"]
+                )
+                sample = build_benchmark_xlsx.extract_detection_text(args, payload)
+                self.assertLess(len(sample), 2 * build_benchmark_xlsx.DETECTION_SAMPLE_CHARS)
+
+    def test_strings_use_shared_strings_table(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            out = Path(td) / "benchmark.xlsx"
+            self._build(
+                "--output",
+                str(out),
+                "--brief",
+                "AI meal planning for busy families & <teams>",
+                "--lang",
+                "en",
             )
 
-            workbook_xml = self._read_zip_text(out, "xl/workbook.xml")
-            self.assertIn('sheet name="摘要"', workbook_xml)
-            self.assertIn('sheet name="竞品基准"', workbook_xml)
-            self.assertIn('sheet name="功能矩阵"', workbook_xml)
-            self.assertIn('sheet name="定价-GTM"', workbook_xml)
-            self.assertIn('sheet name="证据来源"', workbook_xml)
-            self.assertEqual(workbook_xml.count("<sheet name="), 5)
+            parts = self._read_xlsx_parts(out)
+            content_types = parts["[Content_Types].xml"]
+            workbook_rels = parts["xl/_rels/workbook.xml.rels"]
+            shared = parts["xl/sharedStrings.xml"]
+            summary_xml = parts["xl/worksheets/sheet1.xml"]
+            self.assertIn('PartName="/xl/sharedStrings.xml"', content_types)
+            self.assertIn('Target="sharedStrings.xml"', workbook_rels)
+            self.assertIn("<t>Problem Statement</t>", shared)
+            self.assertIn("AI meal planning for busy families &amp; &lt;teams&gt;", shared)
+            self.assertEqual(shared.count("<t>Scope</t>"), 1)
+            self.assertNotIn("inlineStr", summary_xml)
 
-    def test_force_en_sheet_names(self) -> None:
+    def test_numeric_text_written_as_number_cells(self) -> None:
+        payload = {
+            "benchmark": [
+                {
+                    "company_product": "Mealime",
+                    "traction_score": "4.5",
+                    "product_capability_score": 4,
+                },
+                {
+                    "company_product": "Paprika",
+                    "traction_score": "nan",
+                    "product_capability_score": "inf",
+                    "monetization_score": "1e400",
+                    "user_sentiment_score": "1_000",
+                },
+            ],
+            "pricing_gtm": [
+                {
+                    "product": "Mealime",
+                    "entry_price": "0",
+                    "top_tier_price": "$9/mo",
+                    "trial_freemium": True,
+                },
+                {
+                    "product": "Paprika",
+                    "entry_price": "12345678901234567890",
+                    "top_tier_price": "NaN",
+                },
+                # json.dumps writes these as bare NaN/Infinity tokens, which
+                # json.loads reads back as native floats.
+                {
+                    "product": "Plan to Eat",
+                    "entry_price": float("nan"),
+                    "top_tier_price": float("inf"),
+                    "trial_freemium": float("-inf"),
+                },
+            ],
+        }
+        with tempfile.TemporaryDirectory() as td:
+            out = Path(td) / "benchmark.xlsx"
+            payload_path = Path(td) / "input.json"
+            payload_path.write_text(json.dumps(payload), encoding="utf-8")
+            self._build(
+                "--output",
+                str(out),
+                "--input-json",
+                str(payload_path),
+                "--lang",
+                "en",
+            )
+
+            parts = self._read_xlsx_parts(out)
+            benchmark_xml = parts["xl/worksheets/sheet2.xml"]
+            pricing_xml = parts["xl/worksheets/sheet4.xml"]
+            shared = parts["xl/sharedStrings.xml"]
+            self.assertIn('<c r="H2" s="1"><v>4.5</v></c>', benchmark_xml)
+            self.assertIn('<c r="I2" s="1"><v>4</v></c>', benchmark_xml)
+            self.assertIn('<c r="C2" s="1"><v>0</v></c>', pricing_xml)
+            self.assertIn("<t>$9/mo</t>", shared)
+            self.assertNotIn("<v>True</v>", pricing_xml)
+            self.assertRegex(pricing_xml, r'<c r="E2" t="s" s="1"><v>\d+</v></c>')
+            self.assertIn("<t>True</t>", shared)
+            # Non-finite or non-decimal text stays a string cell.
+            for ref in ("H3", "I3", "J3", "K3"):
+                self.assertRegex(benchmark_xml, rf'<c r="{ref}" t="s" s="1"><v>\d+</v></c>')
+            for ref in ("D3", "C4", "D4", "E4"):
+                self.assertRegex(pricing_xml, rf'<c r="{ref}" t="s" s="1"><v>\d+</v></c>')
+            self.assertNotRegex(benchmark_xml + pricing_xml, r"<v>-?(?:nan|inf)</v>")
+            # Long integers keep every digit instead of passing through float.
+            self.assertIn('<c r="C3" s="1"><v>12345678901234567890</v></c>', pricing_xml)
+
+    def test_special_characters_produce_well_formed_xml(self) -> None:
+        payload = {
+            "benchmark": [
+                {
+                    "company_product": "R&D <Labs> \"Pro\" 'X'",
+                    "key_strength": " leading and trailing ",
+                    "key_weakness": "multi\nline",
+                }
+            ],
+            "sources": [{"product": "R&D <Labs>", "url": "https://example.com/?a=1&b=2"}],
+        }
         with tempfile.TemporaryDirectory() as td:
             out = Path(td) / "benchmark.xlsx"
-            subprocess.run(
-                [
-                    "python3",
-                    str(self.script),
+            payload_path = Path(td) / "input.json"
+            payload_path.write_text(json.dumps(payload), encoding="utf-8")
+            self._build(
+                "--output",
+                str(out),
+                "--input-json",
+                str(payload_path),
+                "--brief",
+                "Tom & Jerry's <kitchen>",
+                "--lang",
+                "en",
+            )
+
+            parts = self._read_xlsx_parts(out)
+            for text in parts.values():
+                ElementTree.fromstring(text)
+            shared = parts["xl/sharedStrings.xml"]
+            self.assertIn("R&amp;D &lt;Labs&gt; &quot;Pro&quot; &apos;X&apos;", shared)
+            self.assertIn('<t xml:space="preserve"> leading and trailing </t>', shared)
+
+    def test_compress_level_controls_sheet_compression(self) -> None:
+        sizes = {}
+        with tempfile.TemporaryDirectory() as td:
+            for level in ("0", "9"):
+                out = Path(td) / f"benchmark-{level}.xlsx"
+                self._build(
                     "--output",
                     str(out),
                     "--brief",
-                    "这是一个用于家庭做饭规划的AI产品，包含备菜和库存管理。",
+                    "AI meal planning assistant",
                     "--lang",
                     "en",
-                ],
-                check=True,
-            )
+                    "--compress-level",
+                    level,
+                )
+                with zipfile.ZipFile(out, "r") as zf:
+                    self.assertIsNone(zf.testzip())
+                    sizes[level] = zf.getinfo("xl/worksheets/sheet1.xml").compress_size
+                    methods = {info.compress_type for info in zf.infolist()}
+                if level == "0":
+                    self.assertEqual(methods, {zipfile.ZIP_STORED})
+                else:
+                    self.assertIn(zipfile.ZIP_DEFLATED, methods)
+
+        self.assertLess(sizes["9"], sizes["0"])
 
-            workbook_xml = self._read_zip_text(out, "xl/workbook.xml")
-            self.assertIn('sheet name="Summary"', workbook_xml)
-            self.assertIn('sheet name="Benchmark"', workbook_xml)
-            self.assertIn('sheet name="Feature-Matrix"', workbook_xml)
-            self.assertIn('sheet name="Pricing-GTM"', workbook_xml)
-            self.assertIn('sheet name="Sources"', workbook_xml)
+    def test_small_part_threshold_counts_utf8_bytes(self) -> None:
+        limit = build_benchmark_xlsx.ZIP_STORED_MAX
+        cjk = "摘" * (limit // 2)  # under the limit in chars, over it in bytes
+        ascii_text = "a" * (limit - 1)
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            build_benchmark_xlsx.write_part(zf, "cjk.xml", cjk)
+            build_benchmark_xlsx.write_part(zf, "ascii.xml", ascii_text)
+        with zipfile.ZipFile(buf, "r") as zf:
+            self.assertEqual(zf.getinfo("cjk.xml").compress_type, zipfile.ZIP_DEFLATED)
+            self.assertEqual(zf.getinfo("ascii.xml").compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(zf.read("cjk.xml").decode("utf-8"), cjk)
 
 
 if __name__ == "__main__":